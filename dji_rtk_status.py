@@ -21,13 +21,19 @@ import os
 import re
 import json
 import math
+import hashlib
+import mmap
 import shutil
 import subprocess
+from array import array
+from bisect import bisect_right
 from defusedxml import ElementTree as ET
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 
 # --- QGIS / PyQt ---
 from qgis.PyQt.QtWidgets import (
@@ -42,7 +48,7 @@ from qgis.PyQt.QtWidgets import (
     QMessageBox,
 )
 from qgis.PyQt.QtGui import QIcon, QColor
-from qgis.PyQt.QtCore import QVariant, QSettings
+from qgis.PyQt.QtCore import QVariant, QSettings, QStandardPaths
 from qgis.core import (
     QgsProject,
     QgsPointXY,
@@ -61,6 +67,18 @@ from qgis.core import (
 # For graduated rendering
 from qgis.core import QgsGraduatedSymbolRenderer, QgsRendererRange
 
+# Optional: much faster JSON decoding for large RPT files / exiftool batches
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: streams very large RPT reports record by record instead of loading them whole
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 
 # ==============================================================================
 # Settings / Constants
@@ -68,11 +86,60 @@ from qgis.core import QgsGraduatedSymbolRenderer, QgsRendererRange
 
 TIME_GAP_MIN = 6         # fallback grouping for photos without MRK (kept for parity)
 EXIF_CHUNK = 100         # exiftool batch size
+EXIF_WORKERS = os.cpu_count() or 1  # max parallel exiftool processes (use 1 for spinning disks)
 NEAR_MATCH_M = 5.0       # photo/RPT point <-> MRK row nearest match (meters)
+IMG_EXTS = (".jpg", ".jpeg", ".tif", ".tiff", ".dng")  # lower-case; matched case-insensitively
+EARTH_RADIUS_M = 6371000.0
 
 # QSettings key for storing the ExifTool path (per user/profile)
 EXIFTOOL_SETTINGS_KEY = "dji_rtk_status/exiftool_path"
 
+# Only the tags read when building photo records are requested, which keeps
+# exiftool's JSON small (exiftool tag names are case-insensitive).
+EXIF_TAGS = (
+    "GPSLatitude",
+    "GPSLongitude",
+    # DJI XMP position, so photos without EXIF GPS need no second file read
+    "XMP-drone-dji:GpsLatitude",
+    "XMP-drone-dji:GpsLongitude",
+    "XMP-drone-dji:GpsLongtitude",  # misspelled by some DJI firmware
+    "AbsoluteAltitude",
+    "RelativeAltitude",
+    "FlightYawDegree",
+    "GimbalYawDegree",
+    "FlightPitchDegree",
+    "GimbalPitchDegree",
+    "FlightRollDegree",
+    "GimbalRollDegree",
+    "CreateDate",
+    "DateTimeOriginal",
+    "RTKFlag",
+    "RTKStatus",
+    "RTKStdLat",
+    "RTKStdLon",
+    "RTKStdHgt",
+)
+EXIF_ARGS = ["-j", "-n", "-fast2"] + [f"-{t}" for t in EXIF_TAGS]
+
+# PhotoRecord field -> exiftool JSON keys in priority order (EXIF before DJI XMP).
+# Each key is matched by exact name first, then case-insensitively.
+EXIF_FIELDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("lat", ("GPSLatitude", "GpsLatitude")),
+    ("lon", ("GPSLongitude", "GpsLongitude", "GpsLongtitude")),
+    ("abs_alt", ("AbsoluteAltitude",)),
+    ("rel_alt", ("RelativeAltitude",)),
+    ("yaw", ("FlightYawDegree", "GimbalYawDegree")),
+    ("pitch", ("FlightPitchDegree", "GimbalPitchDegree")),
+    ("roll", ("FlightRollDegree", "GimbalRollDegree")),
+    ("capture_time", ("CreateDate", "DateTimeOriginal")),
+    ("rtk_flag", ("RtkFlag", "RTKStatus")),
+    ("std_n_m", ("RtkStdLat",)),
+    ("std_e_m", ("RtkStdLon",)),
+    ("std_u_m", ("RtkStdHgt",)),
+)
+# Fields that must parse as float (exiftool -j keeps e.g. "+47.6" as a string)
+EXIF_FLOAT_FIELDS = frozenset(("lat", "lon", "abs_alt", "rel_alt", "yaw", "pitch", "roll", "std_n_m", "std_e_m", "std_u_m"))
+
 # --- Quality thresholds (meters) when STDs exist ---
 FIX_EXCELLENT_U = 0.05
 FIX_EXCELLENT_NE = 0.03
@@ -95,14 +162,47 @@ POINT_SIZES = [2.6, 3.4, 4.2]
 
 # --- XMP / DJI namespaces & regex ---
 XMP_RE = re.compile(rb"<x:xmpmeta.*?</x:xmpmeta>", re.DOTALL)
+XMP_HEAD_BYTES = 128 * 1024  # XMP is normally within the first ~64 KB
 NS = {
     "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
     "drone-dji": "http://www.dji.com/drone-dji/1.0/",
 }
+XMP_TAGS = (
+    "GpsLatitude",
+    "GpsLongitude",
+    "GpsLongtitude",  # misspelled by some DJI firmware
+    "AbsoluteAltitude",
+    "RelativeAltitude",
+    "FlightYawDegree",
+    "GimbalYawDegree",
+    "FlightPitchDegree",
+    "GimbalPitchDegree",
+    "FlightRollDegree",
+    "GimbalRollDegree",
+    "RtkFlag",
+    "RtkStdLat",
+    "RtkStdLon",
+    "RtkStdHgt",
+    "CreateDate",
+)
+# Scalar DJI tags in attribute (drone-dji:Tag="v") or element (<drone-dji:Tag>v<) form
+XMP_TAG_RE = {
+    tag: re.compile(rb"drone-dji:" + tag.encode() + rb"""(?:\s*=\s*["']([^"']*)["']|>([^<]*)<)""")
+    for tag in XMP_TAGS
+}
+
+# --- RPT sections (ijson prefixes) ---
+# Streaming reads the report once per section, so it only pays off (in memory) on
+# very large reports and with a C backend; everything else is decoded whole.
+RPT_STREAM_MIN_BYTES = 64 * 1024 * 1024
+RPT_STREAM_BACKENDS = ("yajl2_c", "yajl2_cffi")
+RPT_ROUTE_PREFIX = "SURVEYING_REPORT_ROOT.RTK_PATH_INFO_UNIT.RTK_DETAIL_INFO.item"
+RPT_SHOTS_PREFIX = "SURVEYING_REPORT_ROOT.VISIBLE_CAM_INFO_UNIT.RTK_DETAIL_INFO.item"
+RPT_RTB_PREFIX = "SURVEYING_REPORT_ROOT.RTB_INFO_UNIT"
 
-# --- RPT rows ---
+# --- MRK rows (matched against raw file bytes; [ \t]* keeps a match on one line) ---
 MRK_ROW_RE = re.compile(
-    r"([-\d\.]+),La.*?\t([-\d\.]+),Lon\t([-\d\.]+),Ellh\t([-\d\.]+),\s*([-\d\.]+),\s*([-\d\.]+)\t(\d+),Q"
+    rb"([-\d\.]+),La.*?\t([-\d\.]+),Lon\t([-\d\.]+),Ellh\t([-\d\.]+),[ \t]*([-\d\.]+),[ \t]*([-\d\.]+)\t(\d+),Q"
 )
 
 
@@ -110,20 +210,35 @@ MRK_ROW_RE = re.compile(
 # Dataclasses
 # ==============================================================================
 
-@dataclass
-class MRKEntry:
-    lat: float
-    lon: float
-    ellh: float
-    std_n: float
-    std_e: float
-    std_u: float
-    flag: Optional[int]
-    flight_id: str
-    dir: str
-
-
-@dataclass
+@dataclass(slots=True)
+class MRKTable:
+    """MRK rows from all files, stored column-wise; row i is index i of every column."""
+    lat: array = field(default_factory=lambda: array("d"))
+    lon: array = field(default_factory=lambda: array("d"))
+    ellh: array = field(default_factory=lambda: array("d"))
+    std_n: array = field(default_factory=lambda: array("d"))
+    std_e: array = field(default_factory=lambda: array("d"))
+    std_u: array = field(default_factory=lambda: array("d"))
+    flag: List[Optional[int]] = field(default_factory=list)
+    flight_id: List[str] = field(default_factory=list)
+    dir: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def extend(self, other: "MRKTable") -> None:
+        self.lat.extend(other.lat)
+        self.lon.extend(other.lon)
+        self.ellh.extend(other.ellh)
+        self.std_n.extend(other.std_n)
+        self.std_e.extend(other.std_e)
+        self.std_u.extend(other.std_u)
+        self.flag.extend(other.flag)
+        self.flight_id.extend(other.flight_id)
+        self.dir.extend(other.dir)
+
+
+@dataclass(slots=True)
 class RPTPoint:
     lat: float
     lon: float
@@ -133,14 +248,14 @@ class RPTPoint:
     flight_id: str
 
 
-@dataclass
+@dataclass(slots=True)
 class RPTEvent:
     start: int
     end: int
     kind: str  # e.g., "LOSS", "FEW_SYS", "LESS_SAT"
 
 
-@dataclass
+@dataclass(slots=True)
 class PhotoRecord:
     file: str
     lat: float
@@ -171,10 +286,25 @@ def relid(root: str, path: str) -> str:
     return "." if r in (".", "") else r
 
 
+@lru_cache(maxsize=65536)
 def parse_exif_dt(s: Optional[str]) -> Optional[datetime]:
     if not s:
         return None
     s = s.strip().replace("Z", "")
+    # Fast path for the fixed-width shapes of the formats below (' ', or 'T' after '-' dates).
+    if (
+        len(s) == 19
+        and s[4] == s[7]
+        and (s[4] == ":" or s[4] == "-")
+        and (s[10] == " " or (s[10] == "T" and s[4] == "-"))
+        and s[13] == s[16] == ":"
+    ):
+        parts = (s[0:4], s[5:7], s[8:10], s[11:13], s[14:16], s[17:19])
+        if "".join(parts).isdigit():
+            try:
+                return datetime(*map(int, parts))
+            except ValueError:
+                pass
     for fmt in ("%Y:%m:%d %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"):
         try:
             return datetime.strptime(s, fmt)
@@ -184,31 +314,67 @@ def parse_exif_dt(s: Optional[str]) -> Optional[datetime]:
 
 
 def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    R = 6371000.0
     p1 = math.radians(lat1)
     p2 = math.radians(lat2)
     dphi = math.radians(lat2 - lat1)
     dl = math.radians(lon2 - lon1)
     a = math.sin(dphi / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
-    return 2 * R * math.asin(math.sqrt(a))
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def valid_coords(lat: Optional[float], lon: Optional[float]) -> bool:
+    """True for finite lat/lon (missing XMP numbers come back as NaN)."""
+    return lat is not None and lon is not None and math.isfinite(lat) and math.isfinite(lon)
 
 
 def rmse3d_cm(n: float, e: float, u: float) -> float:
-    return (n * n + e * e + u * u) ** 0.5 * 100.0
+    return math.hypot(n, e, u) * 100.0
 
 
-def safe_get(d: Dict, *keys: str):
+def json_loads(s):
+    """orjson when installed; stdlib json otherwise or for input orjson rejects (e.g. bare NaN)."""
+    if orjson is not None:
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(s)
+
+
+def _exif_value(v, numeric: bool):
+    if v is None or v == "" or v == "NaN":
+        return None
+    if not numeric:
+        return v
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_exif(d: Dict) -> Dict:
     """
-    Robust getter for exiftool JSON keys (case-insensitive, skips NaN/None/empty).
+    Resolve every EXIF_FIELDS entry for one exiftool record. Keys are tried in
+    priority order, each by exact name and then case-insensitively; None, empty,
+    "NaN" and (for EXIF_FLOAT_FIELDS) non-numeric values count as missing.
     """
-    for k in keys:
-        if k in d and d[k] not in (None, "", "NaN"):
-            return d[k]
-    lower = {kk.lower(): vv for kk, vv in d.items()}
-    for k in keys:
-        if k.lower() in lower and lower[k.lower()] not in (None, "", "NaN"):
-            return lower[k.lower()]
-    return None
+    lower: Optional[Dict] = None
+    out = {}
+    for name, keys in EXIF_FIELDS:
+        numeric = name in EXIF_FLOAT_FIELDS
+        val = None
+        for k in keys:
+            if k in d:
+                v = d[k]
+            else:
+                if lower is None:
+                    lower = {kk.lower(): vv for kk, vv in d.items()}
+                v = lower.get(k.lower())
+            val = _exif_value(v, numeric)
+            if val is not None:
+                break
+        out[name] = val
+    return out
 
 
 # ==============================================================================
@@ -216,11 +382,18 @@ def safe_get(d: Dict, *keys: str):
 # ==============================================================================
 
 def extract_xmp_bytes(path: str) -> Optional[bytes]:
+    """
+    XMP lives in an APP1 segment near the start of DJI JPEGs, so only the head
+    is read first; the rest of the file is scanned via mmap (no copy) if needed.
+    """
     try:
         with open(path, "rb") as f:
-            data = f.read()
-        m = XMP_RE.search(data)
-        return m.group(0) if m else None
+            m = XMP_RE.search(f.read(XMP_HEAD_BYTES))
+            if m:
+                return m.group(0)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                m = XMP_RE.search(mm)
+                return bytes(m.group(0)) if m else None
     except Exception:
         return None
 
@@ -230,6 +403,16 @@ def _xmp_get_text(node: ET.Element, tag: str) -> Optional[str]:
     return el.text.strip() if el is not None and el.text is not None else None
 
 
+def _xmp_et_values(xmp: bytes) -> Dict[str, Optional[str]]:
+    """Namespace-aware fallback for XMP packets the tag regexes do not recognize."""
+    root = ET.fromstring(xmp)
+    descs = root.findall(".//rdf:Description", NS)
+    if not descs:
+        return {}
+    d = descs[0]
+    return {tag: d.get(f"{{{NS['drone-dji']}}}{tag}") or _xmp_get_text(d, tag) for tag in XMP_TAGS}
+
+
 def parse_dji_xmp(path: str) -> Dict:
     """
     Fallback parser for DJI XMP when exiftool keys are missing.
@@ -240,11 +423,15 @@ def parse_dji_xmp(path: str) -> Dict:
     if not xmp:
         return out
     try:
-        root = ET.fromstring(xmp)
-        descs = root.findall(".//rdf:Description", NS)
-        if not descs:
+        vals: Dict[str, Optional[str]] = {}
+        for tag, rx in XMP_TAG_RE.items():
+            m = rx.search(xmp)
+            if m:
+                vals[tag] = (m.group(1) if m.group(1) is not None else m.group(2)).decode("utf-8", "ignore").strip()
+        if not vals:
+            vals = _xmp_et_values(xmp)
+        if not vals:
             return out
-        d = descs[0]
 
         def fnum(v):
             try:
@@ -258,18 +445,19 @@ def parse_dji_xmp(path: str) -> Dict:
             except Exception:
                 return None
 
-        out["lat"] = fnum(_xmp_get_text(d, "GpsLatitude"))
-        out["lon"] = fnum(_xmp_get_text(d, "GpsLongitude"))
-        out["abs_alt"] = fnum(_xmp_get_text(d, "AbsoluteAltitude"))
-        out["rel_alt"] = fnum(_xmp_get_text(d, "RelativeAltitude"))
-        out["yaw"] = fnum(_xmp_get_text(d, "FlightYawDegree") or _xmp_get_text(d, "GimbalYawDegree"))
-        out["pitch"] = fnum(_xmp_get_text(d, "FlightPitchDegree") or _xmp_get_text(d, "GimbalPitchDegree"))
-        out["roll"] = fnum(_xmp_get_text(d, "FlightRollDegree") or _xmp_get_text(d, "GimbalRollDegree"))
-        out["rtk_flag"] = fint(_xmp_get_text(d, "RtkFlag"))
-        out["rtk_std_lat"] = fnum(_xmp_get_text(d, "RtkStdLat"))
-        out["rtk_std_lon"] = fnum(_xmp_get_text(d, "RtkStdLon"))
-        out["rtk_std_hgt"] = fnum(_xmp_get_text(d, "RtkStdHgt"))
-        out["capture_time"] = _xmp_get_text(d, "CreateDate") or None
+        g = vals.get
+        out["lat"] = fnum(g("GpsLatitude"))
+        out["lon"] = fnum(g("GpsLongitude") or g("GpsLongtitude"))
+        out["abs_alt"] = fnum(g("AbsoluteAltitude"))
+        out["rel_alt"] = fnum(g("RelativeAltitude"))
+        out["yaw"] = fnum(g("FlightYawDegree") or g("GimbalYawDegree"))
+        out["pitch"] = fnum(g("FlightPitchDegree") or g("GimbalPitchDegree"))
+        out["roll"] = fnum(g("FlightRollDegree") or g("GimbalRollDegree"))
+        out["rtk_flag"] = fint(g("RtkFlag"))
+        out["rtk_std_lat"] = fnum(g("RtkStdLat"))
+        out["rtk_std_lon"] = fnum(g("RtkStdLon"))
+        out["rtk_std_hgt"] = fnum(g("RtkStdHgt"))
+        out["capture_time"] = g("CreateDate") or None
         return out
     except Exception:
         return out
@@ -334,11 +522,98 @@ def _find_exiftool() -> Optional[str]:
     return None
 
 
+def _index_exif_json(raw: bytes, results: Dict[str, Dict]) -> None:
+    """Parse an exiftool ``-j`` payload and store each entry under its normalized path."""
+    try:
+        arr = json_loads(raw.decode("utf-8", errors="ignore"))
+    except Exception:
+        return
+    for j in arr:
+        src = j.get("SourceFile") or j.get("FileName") or ""
+        results[npath(src)] = j
+
+
+class _StayOpenProcess:
+    """One ``exiftool -stay_open`` process, fed argument lists over stdin."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._proc: Optional[subprocess.Popen] = None
+
+    def _ensure(self) -> Optional[subprocess.Popen]:
+        if self._proc is not None and self._proc.poll() is None:
+            return self._proc
+        self._proc = None
+        try:
+            # stderr is discarded: nobody drains it, and a full pipe would stall exiftool.
+            self._proc = subprocess.Popen(
+                [self.path, "-stay_open", "True", "-@", "-"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                **_hide_proc_kwargs(),
+            )
+        except Exception:
+            self._proc = None
+        return self._proc
+
+    def execute(self, args: List[str]) -> Optional[bytes]:
+        """
+        Run one command and return its stdout up to the ``{ready}`` sentinel, or
+        None if the process is unavailable or died.
+        """
+        proc = self._ensure()
+        if proc is None:
+            return None
+        try:
+            proc.stdin.write(("\n".join(args) + "\n-execute\n").encode("utf-8"))
+            proc.stdin.flush()
+            out_lines: List[bytes] = []
+            while True:
+                line = proc.stdout.readline()
+                if not line:
+                    raise EOFError("exiftool exited")
+                if line.rstrip() == b"{ready}":
+                    return b"".join(out_lines)
+                out_lines.append(line)
+        except Exception:
+            self.close()
+            return None
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.write(b"-stay_open\nFalse\n")
+            proc.stdin.flush()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+
+
 class ExifTool:
-    """Helper to read EXIF JSON via exiftool, using stay_open mode for performance."""
+    """
+    Helper to read EXIF JSON via exiftool, using stay_open mode for performance.
+
+    Large batches are split into shards read in parallel, each by its own
+    stay_open process. Use it as a context manager to keep those processes
+    alive across several ``batch_read`` calls; outside a ``with`` block each
+    call starts and stops its own.
+    """
 
     def __init__(self, path: Optional[str] = None) -> None:
         self.path = path or _find_exiftool()
+        self._procs: List[_StayOpenProcess] = []
+        self._in_context = False
+
+    def __enter__(self) -> "ExifTool":
+        self._in_context = True
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._in_context = False
+        self.close()
 
     def ensure(self) -> bool:
         """Try settings/path/auto-find; update settings on success."""
@@ -351,61 +626,57 @@ class ExifTool:
             return True
         return False
 
+    def close(self) -> None:
+        """Shut down all stay_open processes."""
+        procs, self._procs = self._procs, []
+        for proc in procs:
+            proc.close()
+
     def batch_read(self, files: List[str], chunk: int = EXIF_CHUNK) -> Dict[str, Dict]:
         """
-        Read EXIF JSON for all files using stay_open mode (one Perl process for the
-        entire run instead of one per chunk).  Falls back to individual subprocess
-        calls if stay_open fails to start.
+        Read EXIF JSON for all files using stay_open mode (one Perl process per
+        worker for the entire run instead of one per chunk).  Workers run in
+        threads since the decoding happens in the exiftool processes.
         """
         results: Dict[str, Dict] = {}
         if not self.path or not files:
             return results
 
-        kwargs = _hide_proc_kwargs()
+        workers = max(1, min(EXIF_WORKERS, len(files) // chunk))
+        # Processes are started lazily, so stale ones from a changed path are replaced.
+        for p in self._procs:
+            if p.path != self.path:
+                p.close()
+        self._procs = [p for p in self._procs if p.path == self.path]
+        while len(self._procs) < workers:
+            self._procs.append(_StayOpenProcess(self.path))
+
+        size = -(-len(files) // workers)
+        shards = [files[k:k + size] for k in range(0, len(files), size)]
         try:
-            proc = subprocess.Popen(
-                [self.path, "-stay_open", "True", "-@", "-"],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                **kwargs,
-            )
-        except Exception:
-            return self._batch_read_fallback(files, chunk)
-
-        try:
-            for i in range(0, len(files), chunk):
-                ch = files[i:i + chunk]
-                cmd = "\n".join(ch) + "\n-j\n-n\n-fast2\n-execute\n"
-                proc.stdin.write(cmd.encode("utf-8"))
-                proc.stdin.flush()
-
-                out_lines: List[bytes] = []
-                while True:
-                    line = proc.stdout.readline()
-                    if not line or b"{ready}" in line:
-                        break
-                    out_lines.append(line)
-
-                raw = b"".join(out_lines).strip()
-                if raw:
-                    try:
-                        arr = json.loads(raw.decode("utf-8", errors="ignore"))
-                        for j in arr:
-                            src = j.get("SourceFile") or j.get("FileName") or ""
-                            results[npath(src)] = j
-                    except Exception:
-                        pass
+            if len(shards) == 1:
+                results.update(self._read_shard(self._procs[0], shards[0], chunk))
+            else:
+                with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+                    for part in pool.map(self._read_shard, self._procs, shards, [chunk] * len(shards)):
+                        results.update(part)
         finally:
-            try:
-                proc.stdin.write(b"-stay_open\nFalse\n")
-                proc.stdin.flush()
-                proc.wait(timeout=5)
-            except Exception:
-                proc.kill()
+            if not self._in_context:
+                self.close()
 
         return results
 
+    def _read_shard(self, proc: _StayOpenProcess, files: List[str], chunk: int) -> Dict[str, Dict]:
+        """Read one shard on its stay_open process; falls back per chunk if it fails."""
+        results: Dict[str, Dict] = {}
+        for i in range(0, len(files), chunk):
+            raw = proc.execute(EXIF_ARGS + files[i:i + chunk])
+            if raw is None:
+                results.update(self._batch_read_fallback(files[i:], chunk))
+                break
+            _index_exif_json(raw, results)
+        return results
+
     def _batch_read_fallback(self, files: List[str], chunk: int = EXIF_CHUNK) -> Dict[str, Dict]:
         """Spawn one subprocess per chunk (used when stay_open is unavailable)."""
         results: Dict[str, Dict] = {}
@@ -414,87 +685,295 @@ class ExifTool:
             ch = files[i : i + chunk]
             try:
                 proc = subprocess.run(
-                    [self.path, "-j", "-n", "-fast2"] + ch,
+                    [self.path] + EXIF_ARGS + ch,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
                     **kwargs,
                 )
                 if proc.stdout:
-                    arr = json.loads(proc.stdout.decode("utf-8", errors="ignore"))
-                    for j in arr:
-                        src = j.get("SourceFile") or j.get("FileName") or ""
-                        results[npath(src)] = j
+                    _index_exif_json(proc.stdout, results)
             except Exception:
                 continue
         return results
 
 
+# ==============================================================================
+# EXIF cache (per folder, across runs)
+# ==============================================================================
+
+def _exif_cache_file(root: str) -> Optional[str]:
+    """Cache file for one survey folder under the user cache dir, or None if unavailable."""
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    if not base:
+        return None
+    digest = hashlib.sha1(npath(os.path.abspath(root)).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(base, "dji_rtk_status", f"exif_{digest}.json")
+
+
+def _load_exif_cache(path: Optional[str]) -> Dict[str, list]:
+    """``{npath: [mtime_ns, size, exif_json]}``; empty if missing, unreadable or made with other EXIF_ARGS."""
+    if not path or not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, "rb") as fh:
+            data = json_loads(fh.read())
+    except Exception:
+        return {}
+    if not isinstance(data, dict) or data.get("args") != EXIF_ARGS:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def _save_exif_cache(path: Optional[str], entries: Dict[str, list]) -> None:
+    if not path:
+        return
+    tmp = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"args": EXIF_ARGS, "files": entries}, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def read_exif_cached(
+    exiftool: ExifTool, root: str, files: List[Tuple[str, str]], chunk: int = EXIF_CHUNK
+) -> Dict[str, Dict]:
+    """
+    ``exiftool.batch_read`` with a per-folder cache keyed by path and validated
+    by (mtime_ns, size): only new or changed files are sent to exiftool.
+    ``files`` holds ``(path, npath(path))`` pairs. Entries for files no longer
+    under ``root`` are dropped on save.
+    """
+    cache_file = _exif_cache_file(root)
+    cached = _load_exif_cache(cache_file)
+
+    results: Dict[str, Dict] = {}
+    entries: Dict[str, list] = {}
+    stale: List[str] = []
+    stamps: Dict[str, Tuple[int, int]] = {}
+    for p, key in files:
+        try:
+            st = os.stat(p)
+        except OSError:
+            stale.append(p)
+            continue
+        hit = cached.get(key)
+        # Anything but [mtime_ns, size, dict] (e.g. a hand-edited file) is a miss.
+        if (
+            isinstance(hit, list)
+            and len(hit) == 3
+            and hit[0] == st.st_mtime_ns
+            and hit[1] == st.st_size
+            and isinstance(hit[2], dict)
+        ):
+            results[key] = hit[2]
+            entries[key] = hit
+        else:
+            stale.append(p)
+            stamps[key] = (st.st_mtime_ns, st.st_size)
+
+    if stale:
+        fresh = exiftool.batch_read(stale, chunk=chunk)
+        results.update(fresh)
+        for key, j in fresh.items():
+            stamp = stamps.get(key)
+            if stamp is not None:
+                entries[key] = [stamp[0], stamp[1], j]
+
+    if stale or len(entries) != len(cached):
+        _save_exif_cache(cache_file, entries)
+    return results
+
+
 # ==============================================================================
 # Parsing: MRK / RPT
 # ==============================================================================
 
+# Raw RTK flag / status values → canonical flag (50 fix, 34 float, 16 single, 0 none)
+FLAG_CODES: Dict[int, int] = {50: 50, 5: 50, 4: 50, 34: 34, 3: 34, 2: 34, 16: 16, 1: 16, 0: 0}
+FLAG_WORDS: Tuple[Tuple[str, int], ...] = (
+    ("fix", 50),
+    ("float", 34),
+    ("single", 16),
+    ("standalone", 16),
+    ("none", 0),
+    ("invalid", 0),
+)
+
+
 def normalize_flag(v) -> Optional[int]:
     if v is None:
         return None
+    if type(v) is int:
+        return FLAG_CODES.get(v)
     if isinstance(v, (int, float)):
-        v = int(v)
-        if v in (50, 5, 4):
-            return 50
-        if v in (34, 3, 2):
-            return 34
-        if v in (16, 1):
-            return 16
-        if v == 0:
-            return 0
-        return None
+        return FLAG_CODES.get(int(v))
     s = str(v).lower()
-    if "fix" in s:
-        return 50
-    if "float" in s:
-        return 34
-    if "single" in s or "standalone" in s:
-        return 16
-    if "none" in s or "invalid" in s:
-        return 0
+    for word, flag in FLAG_WORDS:
+        if word in s:
+            return flag
     return None
 
 
-def parse_mrk_recursive(root: str) -> List[MRKEntry]:
-    out: List[MRKEntry] = []
-    for dp, _, fns in os.walk(root):
-        for fn in fns:
-            if not fn.lower().endswith(".mrk"):
-                continue
-            fid = f"MRK:{relid(root, dp)}/{os.path.splitext(fn)[0]}".replace("//", "/")
+def _iter_files(root: str, exts: Tuple[str, ...]) -> Iterator[str]:
+    """
+    Yield paths of files under root whose lower-cased name ends with one of
+    exts, top-down like os.walk but reading names and types from os.scandir.
+    Symlinked directories are followed; each directory (by device/inode, or
+    resolved path where inodes are not reported) is read once, so link cycles
+    and duplicate links are harmless.
+    """
+    # All-lower or all-upper names (the usual case) match without lower().
+    cased = exts + tuple(e.upper() for e in exts)
+    seen = set()
+    stack = [root]
+    while stack:
+        top = stack.pop()
+        try:
+            st = os.stat(top)
+        except OSError:
+            continue
+        # Some filesystems (cloud drives, SMB/FUSE mounts) report st_ino 0 for
+        # everything; identify those directories by their resolved path instead.
+        key = (st.st_dev, st.st_ino) if st.st_ino else os.path.realpath(top)
+        if key in seen:
+            continue
+        seen.add(key)
+        found: List[str] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(top) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith(cased) or entry.name.lower().endswith(exts):
+                        found.append(entry.path)
+        except OSError:
+            continue
+        yield from found
+        stack.extend(reversed(subdirs))
+
+
+def _parse_files(parse: Callable, root: str, paths: List[str]) -> list:
+    """Run parse(root, path) over paths on a thread pool, keeping input order."""
+    if len(paths) <= 1:
+        return [parse(root, p) for p in paths]
+    with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as pool:
+        return list(pool.map(lambda p: parse(root, p), paths))
+
+
+def _parse_mrk_file(root: str, path: str) -> Optional[MRKTable]:
+    dp, fn = os.path.split(path)
+    fid = f"MRK:{relid(root, dp)}/{os.path.splitext(fn)[0]}".replace("//", "/")
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with mm:
+            rows = [m.groups() for m in MRK_ROW_RE.finditer(mm)]
+    except Exception:
+        return None
+    vals: List[Tuple[float, ...]] = []
+    for row in rows:
+        try:
+            vals.append(tuple(map(float, row)))
+        except ValueError:
+            continue  # e.g. "1.2.3" or a lone "-"; only this row is dropped
+    if not vals:
+        return None
+    lat, lon, ellh, std_n, std_e, std_u, flag = zip(*vals)
+    cols = [array("d", c) for c in (lat, lon, ellh, std_n, std_e, std_u)]
+    flags = [FLAG_CODES.get(v) for v in map(int, flag)]  # regex guarantees plain digits
+    return MRKTable(*cols, flag=flags, flight_id=[fid] * len(vals), dir=[dp] * len(vals))
+
+
+def parse_mrk_recursive(root: str) -> MRKTable:
+    table = MRKTable()
+    for part in _parse_files(_parse_mrk_file, root, list(_iter_files(root, (".mrk",)))):
+        if part is not None:
+            table.extend(part)
+    return table
+
+
+def _rpt_points(recs: Iterable[Dict], fid: str) -> List[RPTPoint]:
+    return [
+        RPTPoint(
+            lat=rec.get("LATITUDE"),
+            lon=rec.get("LONGITUDE"),
+            height=rec.get("HEIGHT"),
+            ts=rec.get("TIME_STAMP"),
+            flag=normalize_flag(rec.get("RTK_STATUS")),
+            flight_id=fid,
+        )
+        for rec in recs
+    ]
+
+
+def _rpt_sections_stream(path: str, fid: str) -> Tuple[List[RPTPoint], List[RPTPoint], Dict]:
+    """Stream one record at a time instead of building the whole report in memory (needs ijson)."""
+    with open(path, "rb") as f:
+        route_pts = _rpt_points(ijson.items(f, RPT_ROUTE_PREFIX, use_float=True), fid)
+        f.seek(0)
+        shot_pts = _rpt_points(ijson.items(f, RPT_SHOTS_PREFIX, use_float=True), fid)
+        f.seek(0)
+        rtb = next(ijson.items(f, RPT_RTB_PREFIX, use_float=True), None) or {}
+    return route_pts, shot_pts, rtb
+
+
+def _rpt_sections_load(path: str, fid: str) -> Tuple[List[RPTPoint], List[RPTPoint], Dict]:
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        sroot = json_loads(f.read()).get("SURVEYING_REPORT_ROOT", {})
+    # Route (dense)
+    route_pts = _rpt_points((sroot.get("RTK_PATH_INFO_UNIT") or {}).get("RTK_DETAIL_INFO") or [], fid)
+    # Per-capture
+    shot_pts = _rpt_points((sroot.get("VISIBLE_CAM_INFO_UNIT") or {}).get("RTK_DETAIL_INFO") or [], fid)
+    return route_pts, shot_pts, sroot.get("RTB_INFO_UNIT") or {}
+
+
+def _parse_rpt_file(root: str, path: str) -> Optional[Tuple[str, List[RPTPoint], List[RPTPoint], List[RPTEvent]]]:
+    dp, fn = os.path.split(path)
+    fid = f"RPT:{relid(root, dp)}/{os.path.splitext(fn)[0]}".replace("//", "/")
+    events: List[RPTEvent] = []
+    try:
+        sections = None
+        if (
+            ijson is not None
+            and ijson.backend in RPT_STREAM_BACKENDS
+            and os.path.getsize(path) >= RPT_STREAM_MIN_BYTES
+        ):
             try:
-                with open(os.path.join(dp, fn), "r", encoding="utf-8", errors="ignore") as f:
-                    for line in f:
-                        m = MRK_ROW_RE.search(line)
-                        if not m:
-                            continue
-                        lat = float(m.group(1))
-                        lon = float(m.group(2))
-                        ellh = float(m.group(3))
-                        std_n = float(m.group(4))
-                        std_e = float(m.group(5))
-                        std_u = float(m.group(6))
-                        flag = normalize_flag(int(m.group(7)))
-                        out.append(
-                            MRKEntry(
-                                lat=lat,
-                                lon=lon,
-                                ellh=ellh,
-                                std_n=std_n,
-                                std_e=std_e,
-                                std_u=std_u,
-                                flag=flag,
-                                flight_id=fid,
-                                dir=dp,
-                            )
-                        )
-            except Exception:
-                continue
-    return out
+                sections = _rpt_sections_stream(path, fid)
+            except (ijson.JSONError, ValueError):
+                # e.g. bare NaN or invalid UTF-8, which the whole-file decode tolerates
+                sections = None
+        if sections is None:
+            sections = _rpt_sections_load(path, fid)
+        route_pts, shot_pts, rtb = sections
+
+        # Summary windows — RTB_INFO_UNIT
+        def add_intervals(key: str, kind: str) -> None:
+            arr = rtb.get(key) or []
+            for it in arr:
+                st = it.get("START_TIME")
+                en = it.get("END_TIME")
+                if isinstance(st, (int, float)) and isinstance(en, (int, float)):
+                    events.append(RPTEvent(start=int(st), end=int(en), kind=kind))
+
+        add_intervals("RTB_LOSS_ABNORMAL_DURATION", "LOSS")
+        add_intervals("RTB_TOO_FEW_SYSTEMS_ABNORMAL_DURATION", "FEW_SYS")
+        add_intervals("RTB_SATELLITE_ABNORMAL_DURATION", "LESS_SAT")
+    except Exception:
+        return None
+    return fid, route_pts, shot_pts, events
 
 
 def parse_rpt_recursive(root: str) -> Tuple[List[RPTPoint], List[RPTPoint], Dict[str, List[RPTEvent]]]:
@@ -508,75 +987,132 @@ def parse_rpt_recursive(root: str) -> Tuple[List[RPTPoint], List[RPTPoint], Dict
     shot_pts: List[RPTPoint] = []
     events_by_fid: Dict[str, List[RPTEvent]] = defaultdict(list)
 
-    for dp, _, fns in os.walk(root):
-        for fn in fns:
-            if not fn.lower().endswith(".rpt"):
-                continue
-            rpt_path = os.path.join(dp, fn)
-            fid = f"RPT:{relid(root, dp)}/{os.path.splitext(fn)[0]}".replace("//", "/")
-            try:
-                with open(rpt_path, "r", encoding="utf-8", errors="ignore") as f:
-                    data = json.load(f)
-                sroot = data.get("SURVEYING_REPORT_ROOT", {})
-
-                # Route (dense)
-                rtk_path = (sroot.get("RTK_PATH_INFO_UNIT") or {}).get("RTK_DETAIL_INFO") or []
-                for rec in rtk_path:
-                    route_pts.append(
-                        RPTPoint(
-                            lat=rec.get("LATITUDE"),
-                            lon=rec.get("LONGITUDE"),
-                            height=rec.get("HEIGHT"),
-                            ts=rec.get("TIME_STAMP"),
-                            flag=normalize_flag(rec.get("RTK_STATUS")),
-                            flight_id=fid,
-                        )
-                    )
-
-                # Per-capture
-                vis = (sroot.get("VISIBLE_CAM_INFO_UNIT") or {}).get("RTK_DETAIL_INFO") or []
-                for rec in vis:
-                    shot_pts.append(
-                        RPTPoint(
-                            lat=rec.get("LATITUDE"),
-                            lon=rec.get("LONGITUDE"),
-                            height=rec.get("HEIGHT"),
-                            ts=rec.get("TIME_STAMP"),
-                            flag=normalize_flag(rec.get("RTK_STATUS")),
-                            flight_id=fid,
-                        )
-                    )
-
-                # Summary windows — RTB_INFO_UNIT
-                rtb = (sroot.get("RTB_INFO_UNIT") or {})
-
-                def add_intervals(key: str, kind: str) -> None:
-                    arr = rtb.get(key) or []
-                    for it in arr:
-                        st = it.get("START_TIME")
-                        en = it.get("END_TIME")
-                        if isinstance(st, (int, float)) and isinstance(en, (int, float)):
-                            events_by_fid[fid].append(RPTEvent(start=int(st), end=int(en), kind=kind))
-
-                add_intervals("RTB_LOSS_ABNORMAL_DURATION", "LOSS")
-                add_intervals("RTB_TOO_FEW_SYSTEMS_ABNORMAL_DURATION", "FEW_SYS")
-                add_intervals("RTB_SATELLITE_ABNORMAL_DURATION", "LESS_SAT")
-
-            except Exception:
-                continue
+    for part in _parse_files(_parse_rpt_file, root, list(_iter_files(root, (".rpt",)))):
+        if part is None:
+            continue
+        fid, route, shots, events = part
+        route_pts.extend(route)
+        shot_pts.extend(shots)
+        if events:
+            events_by_fid[fid].extend(events)
 
     return route_pts, shot_pts, events_by_fid
 
 
+# ==============================================================================
+# Nearest-point matching
+# ==============================================================================
+
+def stage_coords(lats: Iterable[float], lons: Iterable[float]) -> Tuple[array, array, array]:
+    """Pack points as contiguous (lat_rad, lon_rad, cos_lat) arrays for `nearest_within`."""
+    lat_rad = array("d", map(math.radians, lats))
+    lon_rad = array("d", map(math.radians, lons))
+    cos_lat = array("d", map(math.cos, lat_rad))
+    return lat_rad, lon_rad, cos_lat
+
+
+def nearest_within(
+    lat: float,
+    lon: float,
+    staged: Tuple[array, array, array],
+    max_m: float,
+    candidates: Optional[Iterable[int]] = None,
+) -> Tuple[int, float]:
+    """
+    Index of and haversine distance to the staged point nearest to (lat, lon),
+    or (-1, distance) if it is farther than max_m. Only `candidates` rows are
+    considered when given.
+
+    Candidates are ranked by equirectangular distance scaled by the query
+    point's cos(lat), which needs no trig per point and agrees with haversine
+    to well under a millimetre at NEAR_MATCH_M scales; only the winner is
+    measured with haversine.
+    """
+    lat_rad, lon_rad, _ = staged
+    p1 = math.radians(lat)
+    l1 = math.radians(lon)
+    c1 = math.cos(p1)
+    best_i = -1
+    best_q = math.inf
+    for i in range(len(lat_rad)) if candidates is None else candidates:
+        dy = lat_rad[i] - p1
+        dx = (lon_rad[i] - l1) * c1
+        q = dx * dx + dy * dy
+        if q < best_q:
+            best_q = q
+            best_i = i
+    if best_i < 0:
+        return -1, math.inf
+    d = haversine_m(lat, lon, math.degrees(lat_rad[best_i]), math.degrees(lon_rad[best_i]))
+    return (best_i, d) if d <= max_m else (-1, d)
+
+
+class PointIndex:
+    """
+    Uniform grid over an equirectangular projection of (lat, lon) points, so a
+    radius-limited nearest lookup only checks the cells around the query.
+
+    Longitudes are scaled by the cosine of the highest |lat| in the set, which
+    keeps projected distances at or below true ones: a point within the search
+    radius can never fall outside the neighbouring cells.
+    """
+
+    def __init__(self, lats: Iterable[float], lons: Iterable[float], cell_m: float = NEAR_MATCH_M) -> None:
+        self.staged = stage_coords(lats, lons)
+        self.cell_m = cell_m
+        lat_rad, lon_rad, cos_lat = self.staged
+        self._kx = EARTH_RADIUS_M * max(min(cos_lat, default=1.0), 1e-6)
+        self._cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, (p, l) in enumerate(zip(lat_rad, lon_rad)):
+            self._cells[self._cell(p, l)].append(i)
+
+    def __len__(self) -> int:
+        return len(self.staged[0])
+
+    def _cell(self, lat_rad: float, lon_rad: float) -> Tuple[int, int]:
+        return (
+            math.floor(lon_rad * self._kx / self.cell_m),
+            math.floor(lat_rad * EARTH_RADIUS_M / self.cell_m),
+        )
+
+    def nearest(self, lat: float, lon: float, max_m: float = NEAR_MATCH_M) -> Tuple[int, float]:
+        """Same contract as `nearest_within`, restricted to cells within max_m."""
+        if not self._cells or not (math.isfinite(lat) and math.isfinite(lon)):
+            return -1, math.inf
+        cx, cy = self._cell(math.radians(lat), math.radians(lon))
+        reach = max(1, math.ceil(max_m / self.cell_m))
+        cells = self._cells
+        candidates = [
+            i
+            for dx in range(-reach, reach + 1)
+            for dy in range(-reach, reach + 1)
+            for i in cells.get((cx + dx, cy + dy), ())
+        ]
+        return nearest_within(lat, lon, self.staged, max_m, candidates)
+
+    def nearest_many(self, lats: List[float], lons: List[float], max_m: float = NEAR_MATCH_M) -> List[int]:
+        """Index of the nearest point within max_m for each query (-1 if none)."""
+        if not self._cells:
+            return [-1] * len(lats)
+        nearest = self.nearest
+        return [nearest(lat, lon, max_m)[0] for lat, lon in zip(lats, lons)]
+
+
 # ==============================================================================
 # Quality mapping
 # ==============================================================================
 
+RTK_FLAG_STATUS: Dict[Optional[int], Tuple[str, str]] = {
+    50: ("RTK Fix", "Excellent"),
+    34: ("RTK Float", "Good"),
+    16: ("Single", "Poor"),
+    0: ("No Position", "Poor"),
+}
+
+
 def rtk_flag_to_status(flag: Optional[int], std_n: Optional[float] = None, std_e: Optional[float] = None, std_u: Optional[float] = None) -> Tuple[str, str]:
     """Return (status, quality). If stds are present, apply thresholds for finer grading."""
-    base = {50: ("RTK Fix", "Excellent"), 34: ("RTK Float", "Good"), 16: ("Single", "Poor"), 0: ("No Position", "Poor")}.get(
-        flag, ("Unknown", "Unknown")
-    )
+    base = RTK_FLAG_STATUS.get(flag, ("Unknown", "Unknown"))
     if std_u is None and std_n is None and std_e is None:
         return base
 
@@ -636,33 +1172,36 @@ def build_photo_layers(records: List[PhotoRecord]) -> Tuple[QgsVectorLayer, QgsV
     pr.addAttributes(fields)
     vl.updateFields()
 
+    # Grade each photo once; the flight path reuses it for its segments.
+    graded = [(r, rtk_flag_to_status(r.rtk_flag, r.std_n_m, r.std_e_m, r.std_u_m)) for r in records]
+
     feats: List[QgsFeature] = []
-    for r in records:
+    for r, (status, qual) in graded:
         if r.lat is None or r.lon is None:
             continue
 
-        status, qual = rtk_flag_to_status(r.rtk_flag, r.std_n_m, r.std_e_m, r.std_u_m)
-        n = r.std_n_m or 0.0
-        e = r.std_e_m or 0.0
-        u = r.std_u_m or 0.0
-        rmse_cm = rmse3d_cm(n, e, u)
+        rmse_cm = rmse3d_cm(r.std_n_m or 0.0, r.std_e_m or 0.0, r.std_u_m or 0.0)
 
-        f = QgsFeature()
-        f.setFields(fields)
+        f = QgsFeature(fields)
         f.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(r.lon, r.lat)))
-        f["file"] = r.file
-        f["time"] = r.capture_time or ""
-        f["flight_id"] = r.flight_id or "."
-        f["rtk_flag"] = r.rtk_flag
-        f["rtk_status"] = status
-        f["rtk_quality"] = qual
-        f["std_n_m"] = r.std_n_m
-        f["std_e_m"] = r.std_e_m
-        f["std_u_m"] = r.std_u_m
-        f["rmse_3d_cm"] = rmse_cm
-        f["abs_alt_m"] = r.abs_alt
-        f["rel_alt_m"] = r.rel_alt
-        f["yaw_deg"] = r.yaw
+        # One call in field order instead of a SIP round-trip per attribute.
+        f.setAttributes(
+            [
+                r.file,
+                r.capture_time or "",
+                r.flight_id or ".",
+                r.rtk_flag,
+                status,
+                qual,
+                r.std_n_m,
+                r.std_e_m,
+                r.std_u_m,
+                rmse_cm,
+                r.abs_alt,
+                r.rel_alt,
+                r.yaw,
+            ]
+        )
         feats.append(f)
 
     pr.addFeatures(feats)
@@ -701,32 +1240,22 @@ def build_photo_layers(records: List[PhotoRecord]) -> Tuple[QgsVectorLayer, QgsV
     lpr.addAttributes(lfields)
     ll.updateFields()
 
-    def ptime(t: Optional[str]) -> Optional[datetime]:
-        return parse_exif_dt(t)
-
-    groups: Dict[str, List[PhotoRecord]] = defaultdict(list)
-    for r in records:
-        groups[r.flight_id or "."].append(r)
+    # Capture times are parsed once per photo, not inside the sort key.
+    groups: Dict[str, List[Tuple[Optional[datetime], PhotoRecord, Tuple[str, str]]]] = defaultdict(list)
+    for r, grade in graded:
+        groups[r.flight_id or "."].append((parse_exif_dt(r.capture_time), r, grade))
 
     lfeats: List[QgsFeature] = []
     for fid, recs in groups.items():
-        recs = sorted(
-            recs,
-            key=lambda r: (ptime(r.capture_time) is None, ptime(r.capture_time) or datetime.min, r.file or ""),
-        )
+        recs.sort(key=lambda t: (t[0] is None, t[0] or datetime.min, t[1].file or ""))
         for i in range(1, len(recs)):
-            a, b = recs[i - 1], recs[i]
+            a = recs[i - 1][1]
+            _, b, (status, qual) = recs[i]
             if None in (a.lat, a.lon, b.lat, b.lon):
                 continue
-            status, qual = rtk_flag_to_status(b.rtk_flag, b.std_n_m, b.std_e_m, b.std_u_m)
-            feat = QgsFeature()
-            feat.setFields(lfields)
+            feat = QgsFeature(lfields)
             feat.setGeometry(QgsGeometry.fromPolylineXY([QgsPointXY(a.lon, a.lat), QgsPointXY(b.lon, b.lat)]))
-            feat["flight_id"] = fid
-            feat["from"] = a.file
-            feat["to"] = b.file
-            feat["rtk_status"] = status
-            feat["rtk_quality"] = qual
+            feat.setAttributes([fid, a.file, b.file, status, qual])
             lfeats.append(feat)
     lpr.addFeatures(lfeats)
 
@@ -750,21 +1279,30 @@ def build_photo_layers(records: List[PhotoRecord]) -> Tuple[QgsVectorLayer, QgsV
     return vl, ll
 
 
+def _window_segments(events: List[RPTEvent]) -> Tuple[List[int], List[Optional[str]]]:
+    """
+    Flatten possibly overlapping summary windows into sorted, disjoint segments.
+    Segment i starts at bounds[i] and runs up to the next bound; its kind is the
+    first window in list order covering it, so a bisect lookup matches a linear scan.
+    """
+    bounds = sorted({e.start for e in events} | {e.end + 1 for e in events})
+    kinds = [next((e.kind for e in events if e.start <= b <= e.end), None) for b in bounds]
+    return bounds, kinds
+
+
 def build_rpt_route_layer(route_pts: List[RPTPoint], events_by_fid: Dict[str, List[RPTEvent]]) -> QgsVectorLayer:
     """Route layer from .RPT; quality comes only from RPT summary windows."""
 
-    def reason_for_ts(fid: str, ts: Optional[int]) -> Optional[str]:
-        evs = events_by_fid.get(fid) or []
+    def reason_for_ts(segments: Tuple[List[int], List[Optional[str]]], ts: Optional[int]) -> Optional[str]:
         if ts is None:
             return None
         try:
             t = int(ts)
         except Exception:
             return None
-        for ev in evs:
-            if ev.start <= t <= ev.end:
-                return ev.kind
-        return None
+        bounds, kinds = segments
+        i = bisect_right(bounds, t) - 1
+        return kinds[i] if i >= 0 else None
 
     # line layer
     ll = QgsVectorLayer("LineString?crs=EPSG:4326", "DJI Route (RPT)", "memory")
@@ -788,24 +1326,21 @@ def build_rpt_route_layer(route_pts: List[RPTPoint], events_by_fid: Dict[str, Li
     rfeats: List[QgsFeature] = []
     for fid, pts in groups.items():
         pts = sorted(pts, key=lambda x: (x.ts is None, x.ts or 0))
+        segments = _window_segments(events_by_fid.get(fid) or [])
         for i in range(1, len(pts)):
             a, b = pts[i - 1], pts[i]
             if None in (a.lat, a.lon, b.lat, b.lon):
                 continue
 
-            reason = reason_for_ts(fid, b.ts)
+            reason = reason_for_ts(segments, b.ts)
             qual = RPT_SUMMARY_MAP.get(reason, RPT_SUMMARY_DEFAULT)
             status, _ = rtk_flag_to_status(b.flag)
 
-            feat = QgsFeature()
-            feat.setFields(fields)
+            feat = QgsFeature(fields)
             feat.setGeometry(
                 QgsGeometry.fromPolylineXY([QgsPointXY(a.lon, a.lat), QgsPointXY(b.lon, b.lat)])
             )
-            feat["flight_id"] = fid
-            feat["rpt_quality"] = qual
-            feat["rpt_reason"] = reason or ""
-            feat["rtk_status"] = status
+            feat.setAttributes([fid, qual, reason or "", status])
             rfeats.append(feat)
     lpr.addFeatures(rfeats)
 
@@ -899,6 +1434,7 @@ class DJIRTKStatusPlugin:
             self.iface.removePluginMenu("DJI RTK QA", self.action)
         if self.settingsAction:
             self.iface.removePluginMenu("DJI RTK QA", self.settingsAction)
+        self.exiftool.close()
 
     # --- UI actions ---
     def show_settings(self):
@@ -943,80 +1479,88 @@ class DJIRTKStatusPlugin:
             return
 
         # Collect images recursively
-        img_exts = {".jpg", ".jpeg", ".tif", ".tiff", ".dng"}
-        images: List[str] = []
-        for dp, _, fns in os.walk(root):
-            for fn in fns:
-                if os.path.splitext(fn)[1].lower() in img_exts:
-                    images.append(os.path.join(dp, fn))
+        images = list(_iter_files(root, IMG_EXTS))
+        images_norm = [(p, npath(p)) for p in images]  # exif lookup keys, normalized once
 
         if not images:
             self.iface.messageBar().pushMessage("DJI RTK Status", "No images found.", level=Qgis.Warning, duration=5)
             return
 
-        # Parse MRK & RPT
-        mrk_entries = parse_mrk_recursive(root)
-        rpt_route_pts, rpt_shot_pts, rpt_events = parse_rpt_recursive(root)
-
-        # Read EXIF via exiftool
-        exif_json = self.exiftool.batch_read(images, chunk=EXIF_CHUNK) if self.exiftool.path else {}
-
-        # Build per-photo records
-        records: List[PhotoRecord] = []
-        for p in images:
-            key = npath(p)
-            j = exif_json.get(key, {})
-
+        # Read EXIF via exiftool (cached per folder; stay_open processes for the whole run) while
+        # MRK & RPT are parsed side by side; the three stages are independent
+        with self.exiftool, ThreadPoolExecutor(max_workers=3) as pool:
+            exif_future = (
+                pool.submit(read_exif_cached, self.exiftool, root, images_norm, EXIF_CHUNK) if self.exiftool.path else None
+            )
+            mrk_future = pool.submit(parse_mrk_recursive, root)
+            rpt_future = pool.submit(parse_rpt_recursive, root)
+            mrk = mrk_future.result()
+            rpt_route_pts, rpt_shot_pts, rpt_events = rpt_future.result()
+            mrk_index = PointIndex(mrk.lat, mrk.lon)
+            exif_json = exif_future.result() if exif_future is not None else {}
+
+        # Build per-photo records from exiftool; images it returned nothing
+        # for are collected for the XMP fallback below
+        parsed: List[Tuple[PhotoRecord, Dict]] = []
+        no_exif: List[str] = []
+        for p, key in images_norm:
+            j = exif_json.get(key)
+            if j is None:
+                no_exif.append(p)
+                continue
+            v = normalize_exif(j)
+            g = v.get
+            if not valid_coords(g("lat"), g("lon")):
+                continue
             r = PhotoRecord(
                 file=os.path.basename(p),
-                lat=safe_get(j, "GPSLatitude"),
-                lon=safe_get(j, "GPSLongitude"),
-                abs_alt=safe_get(j, "AbsoluteAltitude"),
-                rel_alt=safe_get(j, "RelativeAltitude"),
-                yaw=safe_get(j, "FlightYawDegree", "GimbalYawDegree"),
-                pitch=safe_get(j, "FlightPitchDegree", "GimbalPitchDegree"),
-                roll=safe_get(j, "FlightRollDegree", "GimbalRollDegree"),
-                capture_time=safe_get(j, "CreateDate", "DateTimeOriginal"),
+                lat=g("lat"),
+                lon=g("lon"),
+                abs_alt=g("abs_alt"),
+                rel_alt=g("rel_alt"),
+                yaw=g("yaw"),
+                pitch=g("pitch"),
+                roll=g("roll"),
+                capture_time=g("capture_time"),
             )
+            parsed.append((r, v))
 
-            # XMP fallback if lat/lon missing
-            if r.lat is None or r.lon is None:
-                rx = parse_dji_xmp(p)
-                r.lat = r.lat if r.lat is not None else rx.get("lat")
-                r.lon = r.lon if r.lon is not None else rx.get("lon")
-                for k in ("abs_alt", "rel_alt", "yaw", "pitch", "roll", "capture_time"):
-                    if getattr(r, k) is None and rx.get(k) is not None:
-                        setattr(r, k, rx.get(k))
-
-            if r.lat is None or r.lon is None:
+        # XMP fallback (exiftool's output already carries the DJI XMP tags)
+        for p in no_exif:
+            rx = parse_dji_xmp(p)
+            if not valid_coords(rx.get("lat"), rx.get("lon")):
                 continue
-
-            # Attach nearest MRK to fill STDs/flag + flight_id
-            best: Optional[MRKEntry] = None
-            bestd = 1e9
-            for e in mrk_entries:
-                d = haversine_m(r.lat, r.lon, e.lat, e.lon)
-                if d < bestd:
-                    bestd = d
-                    best = e
-                    if bestd <= NEAR_MATCH_M and bestd < 0.5:  # early exit if essentially on top
-                        break
-
-            if best and bestd <= NEAR_MATCH_M:
-                r.rtk_flag = best.flag
-                r.std_n_m = best.std_n
-                r.std_e_m = best.std_e
-                r.std_u_m = best.std_u
-                r.flight_id = best.flight_id
+            r = PhotoRecord(
+                file=os.path.basename(p),
+                lat=rx["lat"],
+                lon=rx["lon"],
+                abs_alt=rx.get("abs_alt"),
+                rel_alt=rx.get("rel_alt"),
+                yaw=rx.get("yaw"),
+                pitch=rx.get("pitch"),
+                roll=rx.get("roll"),
+                capture_time=rx.get("capture_time"),
+            )
+            parsed.append((r, {}))
+
+        # Attach nearest MRK to fill STDs/flag + flight_id; EXIF values otherwise
+        records: List[PhotoRecord] = [r for r, _ in parsed]
+        nearest = mrk_index.nearest_many([r.lat for r in records], [r.lon for r in records], NEAR_MATCH_M)
+        for (r, v), idx in zip(parsed, nearest):
+            if idx >= 0:
+                r.rtk_flag = mrk.flag[idx]
+                r.std_n_m = mrk.std_n[idx]
+                r.std_e_m = mrk.std_e[idx]
+                r.std_u_m = mrk.std_u[idx]
+                r.flight_id = mrk.flight_id[idx]
             else:
-                r.rtk_flag = normalize_flag(safe_get(j, "RTKFlag", "RtkFlag", "RTKStatus", "RtkStatus"))
-                r.std_n_m = safe_get(j, "RTKStdLat", "RtkStdLat")
-                r.std_e_m = safe_get(j, "RTKStdLon", "RtkStdLon")
-                r.std_u_m = safe_get(j, "RTKStdHgt", "RtkStdHgt")
+                g = v.get
+                r.rtk_flag = normalize_flag(g("rtk_flag"))
+                r.std_n_m = g("std_n_m")
+                r.std_e_m = g("std_e_m")
+                r.std_u_m = g("std_u_m")
                 r.flight_id = None
 
-            records.append(r)
-
         if not records and not rpt_route_pts:
             self.iface.messageBar().pushMessage(
                 "DJI RTK Status", "No usable metadata found.", level=Qgis.Warning, duration=6
@@ -1032,7 +1576,7 @@ class DJIRTKStatusPlugin:
             rpt_line = build_rpt_route_layer(rpt_route_pts, rpt_events)
             QgsProject.instance().addMapLayer(rpt_line)
 
-        flights = len(set([(r.flight_id or ".") for r in records]))
+        flights = len({r.flight_id or "." for r in records})
         msg = f"Loaded {len(records)} photos across {flights} flight(s)."
         if rpt_route_pts:
             msg += " Added Terra-style route with summary overrides."